@@ -14,38 +14,121 @@ import subprocess
 import sys
 import os
 import re
+import json
+import shutil
+import time
+import tempfile
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+try:
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import DownloadError
+except ImportError:
+    YoutubeDL = None
+    DownloadError = Exception
+
+
+log = logging.getLogger('yfe')
+
+
+# Ưu tiên stream chỉ có video (không kèm audio) để giảm dữ liệu phải tải
+VIDEO_FORMATS = ('bestvideo[ext=mp4][vcodec^=avc1]', 'bestvideo[ext=mp4]', 'best')
+
+# ffmpeg chỉ in lỗi và không đọc stdin (tránh treo khi chạy song song)
+FFMPEG_GLOBAL_OPTS = ['-nostdin', '-loglevel', 'error']
+
+# Giới hạn bước dò định dạng của ffmpeg: stream mp4 của YouTube đã có đủ
+# thông tin codec trong header nên không cần đọc thêm dữ liệu để phân tích
+FFMPEG_PROBE_OPTS = ['-probesize', '32K', '-analyzeduration', '0']
+
+# Giữ kết nối HTTP (keep-alive) cho các range request và tự kết nối lại khi
+# bị ngắt; chỉ áp dụng cho input http(s)
+FFMPEG_HTTP_OPTS = [
+    '-multiple_requests', '1',
+    '-reconnect', '1',
+    '-reconnect_streamed', '1',
+    '-reconnect_delay_max', '2',
+]
+
+# Tham số encoder cho từng định dạng ảnh đầu ra:
+# - jpg: chất lượng cao, YUV 4:2:0 (encode nhanh, file nhỏ)
+# - png: giảm mức nén zlib từ 6 xuống 1 để encode nhanh hơn
+# - webp: chất lượng 90 (thang 0-100 của libwebp)
+OUTPUT_FORMAT_OPTS = {
+    'jpg': ['-c:v', 'mjpeg', '-q:v', '2', '-pix_fmt', 'yuvj420p'],
+    'png': ['-c:v', 'png', '-compression_level', '1'],
+    'webp': ['-c:v', 'libwebp', '-quality', '90'],
+}
+
+# Định dạng frame trên GPU cho từng kiểu giải mã phần cứng (--hwaccel).
+# "auto" để ffmpeg tự chọn và tự tải frame về bộ nhớ thường nên không có ở đây
+HWACCEL_OUTPUT_FORMATS = {
+    'cuda': 'cuda',
+    'vaapi': 'vaapi',
+    'videotoolbox': 'videotoolbox_vld',
+}
+HWACCEL_CHOICES = ('none', 'auto') + tuple(HWACCEL_OUTPUT_FORMATS)
+
+# Tham số đầu ra cho --snap-keyframe. Sau khi seek, keyframe nằm trước mốc
+# thời gian có timestamp âm (t < 0); image2 mặc định bỏ các frame này và ghi
+# keyframe kế tiếp (sau mốc) nên cần giữ nguyên timestamp (passthrough).
+# select chỉ giữ frame có t <= 0 để không bao giờ lấy keyframe sau mốc (input
+# khi đó được giới hạn -t 1 để ffmpeg không đọc tiếp đến hết video)
+SNAP_KEYFRAME_SELECT = 'lte(t,0)'
+SNAP_KEYFRAME_OUTPUT_OPTS = ['-vsync', 'passthrough']
+
+# Kích thước mỗi lần đọc từ pipe stdout của ffmpeg
+PIPE_READ_SIZE = 1 << 16
+
+# Các mốc nằm trong cùng một khoảng dài tối đa số giây này (tính từ mốc đầu
+# cụm) sẽ được lấy chung trong một lần giải mã tuyến tính thay vì seek riêng
+# từng mốc. Giới hạn độ dài cụm để mốc trải đều cả video (ví dụ mỗi 20 giây)
+# không thành một lần giải mã tuần tự toàn bộ video
+CLUSTER_GAP = 30.0
+
+# Thư mục lưu cache stream URL giữa các lần chạy
+CACHE_DIR = Path.home() / '.cache' / 'ytb-frame-extractor'
+
+# Các dạng link YouTube hợp lệ: watch?v=, shorts/ và youtu.be/
+_YOUTUBE_URL_RE = re.compile(
+    r'(https?://)?(www\.)?(youtube\.com/(watch\?v=|shorts/)|youtu\.be/)[\w-]+'
+)
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/)([\w-]+)')
+
+# Định dạng timestamp hợp lệ: MM:SS hoặc HH:MM:SS (giây có thể có phần thập phân)
+_TS_RE = re.compile(r'^(?:(\d+):)?(\d+):(\d+(?:\.\d+)?)$')
 
 
 def check_dependencies():
     """Kiểm tra các dependencies cần thiết."""
     missing = []
     
-    # Kiểm tra ffmpeg
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Kiểm tra ffmpeg (chỉ tìm trong PATH, không cần chạy thử)
+    if shutil.which('ffmpeg') is None:
         missing.append('ffmpeg')
     
-    # Kiểm tra yt-dlp
-    try:
-        subprocess.run(['yt-dlp', '--version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Kiểm tra yt-dlp (dùng dạng thư viện)
+    if YoutubeDL is None:
         missing.append('yt-dlp')
     
     if missing:
-        print("❌ Thiếu các dependencies sau:")
+        log.error("❌ Thiếu các dependencies sau:")
         for dep in missing:
             if dep == 'ffmpeg':
-                print(f"   - {dep}: sudo apt install ffmpeg")
+                log.error(f"   - {dep}: sudo apt install ffmpeg")
             else:
-                print(f"   - {dep}: pip3 install {dep}")
+                log.error(f"   - {dep}: pip3 install {dep}")
         sys.exit(1)
     
-    print("✅ Tất cả dependencies đã được cài đặt.")
+    log.info("✅ Tất cả dependencies đã được cài đặt.")
 
 
+@lru_cache(maxsize=4096)
 def parse_timestamp(timestamp: str) -> float:
     """
     Chuyển đổi timestamp từ định dạng MM:SS hoặc HH:MM:SS sang giây.
@@ -57,20 +140,16 @@ def parse_timestamp(timestamp: str) -> float:
         Số giây tương ứng
     """
     timestamp = timestamp.strip()
-    parts = timestamp.split(':')
-    
-    if len(parts) == 2:
-        # MM:SS
-        minutes, seconds = parts
-        return int(minutes) * 60 + float(seconds)
-    elif len(parts) == 3:
-        # HH:MM:SS
-        hours, minutes, seconds = parts
-        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
-    else:
+    match = _TS_RE.match(timestamp)
+    if not match:
         raise ValueError(f"Định dạng thời gian không hợp lệ: {timestamp}")
+    
+    # Nhóm giờ không có với định dạng MM:SS
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)
 
 
+@lru_cache(maxsize=4096)
 def format_timestamp_for_filename(timestamp: str) -> str:
     """
     Chuyển đổi timestamp sang định dạng phù hợp cho tên file.
@@ -79,94 +158,628 @@ def format_timestamp_for_filename(timestamp: str) -> str:
     return timestamp.strip().replace(':', '-')
 
 
-def get_video_stream_url(youtube_url: str, cookies_file: str = None) -> str:
+def build_format_selector(max_height: int = None) -> str:
+    """
+    Tạo chuỗi chọn định dạng cho yt-dlp.
+    Ví dụ: 720 -> "bestvideo[ext=mp4][vcodec^=avc1][height<=?720]/..."
+    """
+    limit = f"[height<=?{max_height}]" if max_height else ""
+    return '/'.join(fmt + limit for fmt in VIDEO_FORMATS)
+
+
+def extract_video_id(youtube_url: str) -> str:
+    """
+    Lấy video ID từ URL YouTube.
+    Ví dụ: "https://youtu.be/dQw4w9WgXcQ" -> "dQw4w9WgXcQ"
+    """
+    match = _VIDEO_ID_RE.search(youtube_url)
+    return match.group(1) if match else None
+
+
+def get_video_stream_url(youtube_url: str, cookies_file: str = None, max_height: int = None) -> str:
     """
     Lấy direct stream URL của video YouTube.
     
     Args:
         youtube_url: URL của video YouTube
         cookies_file: Đường dẫn đến file cookies (tùy chọn)
+        max_height: Chiều cao tối đa của video (tùy chọn)
     
     Returns:
         Direct stream URL
     """
-    print(f"🔍 Đang lấy thông tin video từ YouTube...")
+    log.info(f"🔍 Đang lấy thông tin video từ YouTube...")
+    
+    options = {
+        'format': build_format_selector(max_height),
+        'quiet': True,
+        'no_warnings': True,
+    }
+    
+    # Thêm cookies nếu có
+    if cookies_file and os.path.exists(cookies_file):
+        options['cookiefile'] = cookies_file
+        log.info(f"🍪 Sử dụng cookies từ: {cookies_file}")
     
     try:
-        cmd = ['yt-dlp', '-f', 'best[ext=mp4]/best', '-g']
-        
-        # Thêm cookies nếu có
-        if cookies_file and os.path.exists(cookies_file):
-            cmd.extend(['--cookies', cookies_file])
-            print(f"🍪 Sử dụng cookies từ: {cookies_file}")
-        
-        cmd.append(youtube_url)
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        stream_url = result.stdout.strip()
-        
-        if not stream_url:
-            raise Exception("Không thể lấy stream URL")
-        
-        print("✅ Đã lấy được stream URL.")
-        return stream_url
-        
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Lỗi khi lấy video: {e.stderr}")
+        with YoutubeDL(options) as ydl:
+            info = ydl.extract_info(youtube_url, download=False)
+    except DownloadError as e:
+        log.error(f"❌ Lỗi khi lấy video: {e}")
         sys.exit(1)
+    
+    stream_url = info.get('url')
+    if not stream_url and info.get('requested_formats'):
+        stream_url = info['requested_formats'][0].get('url')
+    
+    if not stream_url:
+        log.error("❌ Lỗi khi lấy video: Không thể lấy stream URL")
+        sys.exit(1)
+    
+    log.info("✅ Đã lấy được stream URL.")
+    return stream_url
+
+
+def _stream_url_expiry(stream_url: str) -> float:
+    """Đọc thời điểm hết hạn (tham số expire) của stream URL, 0 nếu không có."""
+    try:
+        return float(parse_qs(urlparse(stream_url).query)['expire'][0])
+    except (KeyError, IndexError, ValueError):
+        return 0.0
 
 
-def extract_frame(stream_url: str, timestamp: str, output_dir: Path) -> str:
+def get_video_stream_url_cached(youtube_url: str, cookies_file: str = None, max_height: int = None,
+                                refresh: bool = False) -> tuple:
+    """
+    Như get_video_stream_url nhưng dùng lại stream URL đã lưu nếu còn hạn.
+    
+    Cache được lưu tại ~/.cache/ytb-frame-extractor/<video_id>.json, nhờ đó
+    các lần chạy sau (chỉ đổi mốc thời gian) không phải gọi lại yt-dlp.
+    
+    Args:
+        youtube_url: URL của video YouTube
+        cookies_file: Đường dẫn đến file cookies (tùy chọn)
+        max_height: Chiều cao tối đa của video (tùy chọn)
+        refresh: Xóa cache của video và lấy lại stream URL từ YouTube
+    
+    Returns:
+        (Direct stream URL, True nếu URL lấy từ cache)
+    """
+    video_id = extract_video_id(youtube_url)
+    if not video_id:
+        return get_video_stream_url(youtube_url, cookies_file, max_height), False
+    
+    format_selector = build_format_selector(max_height)
+    cache_file = CACHE_DIR / f"{video_id}.json"
+    
+    if refresh:
+        # URL googlevideo gắn với client nên có thể bị từ chối (403) trước
+        # thời điểm expire; xóa cache để không dùng lại URL đó
+        try:
+            cache_file.unlink()
+        except OSError:
+            pass
+    else:
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            # Chỉ dùng lại nếu cùng định dạng và còn hạn ít nhất 60 giây
+            if (cached.get('format') == format_selector
+                    and _stream_url_expiry(cached['url']) > time.time() + 60):
+                log.info("✅ Dùng lại stream URL đã lưu trong cache.")
+                return cached['url'], True
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+    
+    stream_url = get_video_stream_url(youtube_url, cookies_file, max_height)
+    
+    # Ghi cache qua file tạm để tránh file hỏng khi bị ngắt giữa chừng
+    tmp_path = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(CACHE_DIR), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'url': stream_url, 'format': format_selector}, f)
+        os.replace(tmp_path, str(cache_file))
+        tmp_path = None
+    except OSError as e:
+        log.warning(f"⚠️  Không ghi được cache: {e}")
+    finally:
+        # Xóa file tạm nếu chưa được đổi tên thành file cache
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    return stream_url, False
+
+
+def output_filename(timestamp: str, image_format: str, video_id: str = None,
+                    snap_keyframe: bool = False) -> str:
+    """
+    Tạo tên file ảnh cho một mốc thời gian.
+    
+    Khi biết video ID, tên file gồm video ID và số giây nên cùng một frame
+    luôn có cùng tên, dùng để bỏ qua các frame đã trích xuất ở lần chạy trước.
+    Ảnh lấy bằng --snap-keyframe có thêm hậu tố "_key" để không bị dùng lại
+    cho yêu cầu lấy frame chính xác (và ngược lại).
+    Ví dụ: ("02:30", "jpg", "dQw4w9WgXcQ") -> "dQw4w9WgXcQ_150.000.jpg"
+           ("02:30", "jpg", "dQw4w9WgXcQ", True) -> "dQw4w9WgXcQ_150.000_key.jpg"
+           ("02:30", "jpg") -> "screenshot_02-30.jpg"
+    """
+    suffix = "_key" if snap_keyframe else ""
+    if video_id:
+        return f"{video_id}_{parse_timestamp(timestamp):.3f}{suffix}.{image_format}"
+    return f"screenshot_{format_timestamp_for_filename(timestamp)}{suffix}.{image_format}"
+
+
+def find_cached_outputs(timestamps: list, out_prefix: str, image_format: str,
+                        video_id: str, snap_keyframe: bool = False) -> dict:
+    """
+    Tìm các mốc thời gian đã có ảnh (khác rỗng) từ lần chạy trước.
+    
+    Returns:
+        Dict {mốc thời gian: đường dẫn file ảnh đã có}
+    """
+    cached = {}
+    for ts in timestamps:
+        filename = output_filename(ts, image_format, video_id, snap_keyframe)
+        output_path = f"{out_prefix}{os.sep}{filename}"
+        try:
+            if os.stat(output_path).st_size > 0:
+                cached[ts] = output_path
+        except OSError:
+            pass
+    return cached
+
+
+def cluster_timestamps(timestamps: list, gap: float = CLUSTER_GAP) -> list:
+    """
+    Gom các mốc thời gian gần nhau thành từng cụm.
+    
+    Các mốc được sắp xếp tăng dần; một mốc thuộc cụm hiện tại nếu cách mốc
+    đầu tiên của cụm không quá `gap` giây, nên mỗi cụm dài tối đa `gap` giây.
+    Ví dụ: ["00:10", "05:00", "00:25", "00:45"] -> [["00:10", "00:25"], ["00:45"], ["05:00"]]
+    """
+    clusters = []
+    cluster_start = None
+    for ts in sorted(timestamps, key=parse_timestamp):
+        seconds = parse_timestamp(ts)
+        if clusters and seconds - cluster_start <= gap:
+            clusters[-1].append(ts)
+        else:
+            clusters.append([ts])
+            cluster_start = seconds
+    return clusters
+
+
+def ffmpeg_input_args(stream_url: str, seconds: float, snap_keyframe: bool = False,
+                      duration: float = None, hwaccel: str = 'none') -> list:
+    """
+    Tạo các tham số input cho ffmpeg: tùy chọn kết nối HTTP, dò định dạng
+    tối thiểu, rồi -ss đặt trước -i để seek nhanh đến thời điểm cần lấy.
+    
+    Với snap_keyframe, ffmpeg chỉ giải mã keyframe mà nó seek tới (keyframe
+    nằm tại hoặc ngay trước thời điểm yêu cầu) thay vì giải mã tiếp các
+    frame P/B cho đến đúng thời điểm. Nhanh hơn nhiều nhưng ảnh có thể lệch
+    tối đa một GOP (thường vài giây) so với mốc thời gian. Phía đầu ra cần
+    thêm SNAP_KEYFRAME_OUTPUT_OPTS để keyframe đó không bị bỏ qua.
+    
+    duration (giây) giới hạn lượng dữ liệu ffmpeg đọc sau điểm seek.
+    hwaccel chọn kiểu giải mã phần cứng ("none" để giải mã bằng CPU).
+    """
+    args = []
+    if stream_url.startswith(('http://', 'https://')):
+        args.extend(FFMPEG_HTTP_OPTS)
+    args.extend(FFMPEG_PROBE_OPTS)
+    if hwaccel != 'none':
+        args.extend(['-hwaccel', hwaccel])
+        if hwaccel in HWACCEL_OUTPUT_FORMATS:
+            args.extend(['-hwaccel_output_format', HWACCEL_OUTPUT_FORMATS[hwaccel]])
+    if snap_keyframe:
+        args.extend(['-skip_frame', 'nokey', '-noaccurate_seek'])
+    args.extend(['-ss', str(seconds)])
+    if duration is not None:
+        args.extend(['-t', str(duration)])
+    args.extend(['-i', stream_url])
+    return args
+
+
+def ffmpeg_filter_args(hwaccel: str = 'none', select: str = None) -> list:
+    """
+    Tạo tham số -vf: lọc frame bằng select (nếu có) rồi mới tải frame từ GPU
+    về bộ nhớ thường, để chỉ những frame được giữ lại phải copy khỏi GPU.
+    """
+    filters = []
+    if select:
+        filters.append(f"select='{select}'")
+    if hwaccel in HWACCEL_OUTPUT_FORMATS:
+        filters.append('hwdownload,format=nv12')
+    return ['-vf', ','.join(filters)] if filters else []
+
+
+def extract_frame(stream_url: str, timestamp: str, out_prefix: str,
+                  image_format: str = 'jpg', snap_keyframe: bool = False,
+                  hwaccel: str = 'none', offset: float = 0.0,
+                  video_id: str = None) -> str:
     """
     Trích xuất 1 frame tại thời điểm cụ thể.
     
     Args:
         stream_url: Direct stream URL của video
         timestamp: Mốc thời gian (định dạng MM:SS hoặc HH:MM:SS)
-        output_dir: Thư mục đầu ra
+        out_prefix: Đường dẫn tuyệt đối của thư mục đầu ra
+        image_format: Định dạng ảnh (jpg, png hoặc webp)
+        snap_keyframe: Lấy keyframe gần nhất thay vì frame chính xác
+        hwaccel: Kiểu giải mã phần cứng (none, auto, cuda, vaapi, videotoolbox)
+        offset: Thời điểm trong video gốc ứng với giây 0 của stream_url
+            (khác 0 khi stream_url là một đoạn đã tải về bằng fetch_section)
+        video_id: Video ID dùng để đặt tên file (xem output_filename)
     
     Returns:
         Đường dẫn file ảnh đã tạo
     """
     seconds = parse_timestamp(timestamp)
-    filename = f"screenshot_{format_timestamp_for_filename(timestamp)}.png"
-    output_path = output_dir / filename
+    filename = output_filename(timestamp, image_format, video_id, snap_keyframe)
+    output_path = f"{out_prefix}{os.sep}{filename}"
+    # ffmpeg ghi vào file tạm, chỉ đổi tên khi thành công để không để lại ảnh ghi dở
+    tmp_path = partial_path(output_path)
     
-    print(f"📸 Đang trích xuất frame tại {timestamp} ({seconds}s)...")
+    log.debug("📸 Đang trích xuất frame tại %s (%ss)...", timestamp, seconds)
     
     try:
         # Sử dụng -ss trước input để seek nhanh
         subprocess.run([
-            'ffmpeg',
-            '-ss', str(seconds),      # Seek đến thời điểm
-            '-i', stream_url,          # Input stream
+            'ffmpeg', *FFMPEG_GLOBAL_OPTS,
+            *ffmpeg_input_args(stream_url, seconds - offset, snap_keyframe,
+                               duration=1 if snap_keyframe else None, hwaccel=hwaccel),
+            '-an',                     # Bỏ qua audio
+            *ffmpeg_filter_args(hwaccel, SNAP_KEYFRAME_SELECT if snap_keyframe else None),
+            *(SNAP_KEYFRAME_OUTPUT_OPTS if snap_keyframe else []),
             '-frames:v', '1',          # Chỉ lấy 1 frame
-            '-q:v', '2',               # Chất lượng cao
+            *OUTPUT_FORMAT_OPTS[image_format],
             '-y',                      # Ghi đè nếu file tồn tại
-            str(output_path)
-        ], capture_output=True, check=True)
+            tmp_path
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        # Không có frame nào (ví dụ mốc vượt quá độ dài video) thì ffmpeg vẫn
+        # thoát 0; với webp file tạm vẫn được tạo nhưng rỗng
+        if os.path.getsize(tmp_path) == 0:
+            log.error(f"   ❌ Không có frame nào tại {timestamp}")
+            return None
+        os.replace(tmp_path, output_path)
         
-        print(f"   ✅ Đã lưu: {filename}")
-        return str(output_path)
+        log.info(f"   ✅ Đã lưu: {filename}")
+        return output_path
         
     except subprocess.CalledProcessError as e:
-        print(f"   ❌ Lỗi khi trích xuất frame tại {timestamp}: {e.stderr.decode()}")
+        log.error(f"   ❌ Lỗi khi trích xuất frame tại {timestamp}: {e.stderr.decode(errors='replace').strip()}")
+        return None
+    except OSError as e:
+        # Ví dụ: mốc vượt quá độ dài video, hoặc với snap_keyframe không có
+        # keyframe nào tại hoặc trước mốc, nên ffmpeg không ghi ra file nào
+        log.error(f"   ❌ Không lưu được frame tại {timestamp}: {e}")
+        return None
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _image_length(buffer: bytearray, image_format: str) -> int:
+    """
+    Tính độ dài của ảnh đầu tiên trong buffer (dữ liệu image2pipe của ffmpeg).
+    
+    Returns:
+        Số byte của ảnh, hoặc None nếu buffer chưa chứa đủ một ảnh
+    """
+    if image_format == 'png':
+        # Chữ ký 8 byte, sau đó là các chunk (độ dài, loại, dữ liệu, CRC) đến IEND
+        pos = 8
+        while len(buffer) >= pos + 8:
+            chunk_length = int.from_bytes(buffer[pos:pos + 4], 'big')
+            chunk_type = bytes(buffer[pos + 4:pos + 8])
+            pos += 12 + chunk_length
+            if chunk_type == b'IEND':
+                return pos if len(buffer) >= pos else None
+        return None
+    
+    if image_format == 'jpg':
+        # Các segment có độ dài đến SOS, sau đó dữ liệu nén kết thúc bằng EOI
+        pos = 2
+        while len(buffer) >= pos + 4:
+            marker = buffer[pos + 1]
+            pos += 2 + int.from_bytes(buffer[pos + 2:pos + 4], 'big')
+            if marker == 0xDA:
+                end = buffer.find(b'\xff\xd9', pos)
+                return end + 2 if end >= 0 else None
+        return None
+    
+    # webp: header RIFF chứa độ dài file
+    if len(buffer) < 8:
         return None
+    length = 8 + int.from_bytes(buffer[4:8], 'little')
+    length += length & 1
+    return length if len(buffer) >= length else None
+
+
+def partial_path(output_path: str) -> str:
+    """
+    Tên file tạm (ẩn, giữ nguyên phần mở rộng) dùng khi đang ghi output_path.
+    Tên có PID để nhiều tiến trình cùng ghi một frame vào một thư mục (ví dụ
+    chạy song song bằng xargs -P) không ghi đè file tạm của nhau; trong một
+    tiến trình mỗi frame chỉ được ghi bởi một job.
+    Ví dụ: "/out/abc_30.000.jpg" -> "/out/.tmp-4242-abc_30.000.jpg"
+    """
+    directory, filename = os.path.split(output_path)
+    return os.path.join(directory, f".tmp-{os.getpid()}-{filename}")
+
+
+def write_file_atomic(output_path: str, data: bytes):
+    """Ghi dữ liệu qua file tạm rồi đổi tên, để không để lại file ghi dở."""
+    tmp_path = partial_path(output_path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def iter_piped_images(stream, image_format: str):
+    """
+    Tách luồng image2pipe của ffmpeg thành từng ảnh.
+    
+    Args:
+        stream: stdout của tiến trình ffmpeg
+        image_format: Định dạng ảnh (jpg, png hoặc webp)
+    
+    Yields:
+        Dữ liệu (bytes) của từng ảnh theo thứ tự ffmpeg xuất ra
+    """
+    buffer = bytearray()
+    while True:
+        length = _image_length(buffer, image_format)
+        if length:
+            yield bytes(buffer[:length])
+            del buffer[:length]
+            continue
+        chunk = stream.read1(PIPE_READ_SIZE)
+        if not chunk:
+            return
+        buffer.extend(chunk)
+
+
+def extract_frames_batch(stream_url: str, timestamps: list, out_prefix: str,
+                         image_format: str = 'jpg', hwaccel: str = 'none',
+                         video_id: str = None) -> list:
+    """
+    Trích xuất nhiều frame gần nhau bằng một lần seek và giải mã tuyến tính.
+    
+    ffmpeg seek một lần đến mốc sớm nhất rồi giải mã liên tục đến mốc muộn
+    nhất; filter select giữ lại frame đầu tiên tại hoặc sau mỗi mốc. Các ảnh
+    được ghi ra stdout (image2pipe) và được tách trong bộ nhớ; chỉ khi số
+    frame nhận được khớp với số mốc thì ảnh mới được lưu vào tên file cuối.
+    Nếu không khớp (ví dụ hai mốc rơi vào cùng một frame, khiến các ảnh sau
+    bị lệch mốc), không ảnh nào được lưu và các mốc sẽ được trích xuất lại
+    từng cái một bằng extract_frame.
+    
+    Args:
+        stream_url: Direct stream URL của video
+        timestamps: Danh sách mốc thời gian (định dạng MM:SS hoặc HH:MM:SS)
+        out_prefix: Đường dẫn tuyệt đối của thư mục đầu ra
+        image_format: Định dạng ảnh (jpg, png hoặc webp)
+        hwaccel: Kiểu giải mã phần cứng (none, auto, cuda, vaapi, videotoolbox)
+        video_id: Video ID dùng để đặt tên file (xem output_filename)
+    
+    Returns:
+        Danh sách đường dẫn các file ảnh đã tạo
+    """
+    # Sắp xếp tăng dần để ffmpeg đọc stream theo thứ tự tuyến tính
+    ordered = sorted(timestamps, key=parse_timestamp)
+    start = parse_timestamp(ordered[0])
+    end = parse_timestamp(ordered[-1])
+    
+    # t tính từ điểm seek; mỗi mốc chọn frame đầu tiên có t >= mốc đó
+    select = '+'.join(
+        f"gte(t,{offset})*not(gte(prev_t,{offset}))"
+        for offset in (round(parse_timestamp(ts) - start, 6) for ts in ordered)
+    )
+    
+    log.debug("📸 Đang trích xuất %d frame: %s...", len(ordered), ', '.join(ordered))
+    
+    images = []
+    # stderr ghi ra file tạm để ffmpeg không bị chặn khi pipe stderr đầy
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen([
+            'ffmpeg', *FFMPEG_GLOBAL_OPTS,
+            *ffmpeg_input_args(stream_url, start, duration=end - start + 1, hwaccel=hwaccel),
+            '-an',                         # Bỏ qua audio
+            *ffmpeg_filter_args(hwaccel, select),   # Chỉ giữ các frame cần lấy
+            '-vsync', 'vfr',               # Không nhân bản frame
+            '-frames:v', str(len(ordered)),
+            *OUTPUT_FORMAT_OPTS[image_format],
+            '-f', 'image2pipe',
+            '-'
+        ], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file)
+        
+        try:
+            with proc.stdout:
+                images = list(iter_piped_images(proc.stdout, image_format))
+            returncode = proc.wait()
+        finally:
+            # Không để lại tiến trình ffmpeg nếu việc đọc bị lỗi giữa chừng
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        
+        if returncode != 0:
+            stderr_file.seek(0)
+            log.error(f"   ❌ Lỗi khi trích xuất frames: {stderr_file.read().decode(errors='replace').strip()}")
+    
+    # Chỉ lưu khi số ảnh khớp, nếu không ảnh sẽ bị gán nhầm mốc thời gian
+    if len(images) == len(ordered):
+        extracted = []
+        for ts, image in zip(ordered, images):
+            filename = output_filename(ts, image_format, video_id)
+            output_path = f"{out_prefix}{os.sep}{filename}"
+            try:
+                write_file_atomic(output_path, image)
+            except OSError as e:
+                # Ví dụ: đầy ổ đĩa hoặc không có quyền ghi; vẫn lưu các frame còn lại
+                log.error(f"   ❌ Không lưu được frame tại {ts}: {e}")
+                continue
+            log.info(f"   ✅ Đã lưu: {filename}")
+            extracted.append(output_path)
+        return extracted
+    
+    log.warning(f"   ⚠️  Nhận được {len(images)}/{len(ordered)} frame, trích xuất lại từng mốc...")
+    extracted = []
+    for ts in ordered:
+        result = extract_frame(stream_url, ts, out_prefix, image_format,
+                               hwaccel=hwaccel, video_id=video_id)
+        if result:
+            extracted.append(result)
+    return extracted
+
+
+def fetch_section(stream_url: str, cluster: list, section_path: str) -> bool:
+    """
+    Tải về máy đoạn video chứa một cụm mốc thời gian.
+    
+    Đoạn được copy nguyên (-c copy, không giải mã) từ mốc đầu đến mốc cuối
+    của cụm, để sau đó mọi lần seek trong cụm chỉ đọc file trên đĩa thay vì
+    gửi request mới lên YouTube.
+    
+    Args:
+        stream_url: Direct stream URL của video
+        cluster: Các mốc thời gian của cụm (đã sắp xếp tăng dần)
+        section_path: Đường dẫn file lưu đoạn video
+    
+    Returns:
+        True nếu tải thành công
+    """
+    start = parse_timestamp(cluster[0])
+    end = parse_timestamp(cluster[-1])
+    
+    log.info(f"⬇️  Đang tải đoạn {cluster[0]} - {cluster[-1]}...")
+    
+    try:
+        subprocess.run([
+            'ffmpeg', *FFMPEG_GLOBAL_OPTS,
+            *ffmpeg_input_args(stream_url, start, duration=end - start + 1),
+            '-map', '0:v:0',           # Chỉ lấy video
+            '-c', 'copy',              # Copy nguyên, không giải mã
+            '-y',
+            section_path
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        log.warning(f"   ⚠️  Không tải được đoạn {cluster[0]} - {cluster[-1]}: "
+                    f"{e.stderr.decode(errors='replace').strip()}")
+        return False
+
+
+def _extract_cluster(stream_url: str, cluster: list, out_prefix: str,
+                     image_format: str, snap_keyframe: bool, hwaccel: str,
+                     offset: float = 0.0, video_id: str = None) -> list:
+    """Trích xuất một cụm: seek riêng nếu chỉ có một mốc, ngược lại giải mã tuyến tính."""
+    if len(cluster) == 1:
+        result = extract_frame(stream_url, cluster[0], out_prefix, image_format,
+                               snap_keyframe, hwaccel, offset, video_id)
+        return [result] if result else []
+    return extract_frames_batch(stream_url, cluster, out_prefix, image_format,
+                                hwaccel, video_id)
+
+
+def _extract_section(stream_url: str, cluster: list, section_path: str, out_prefix: str,
+                     image_format: str, hwaccel: str, video_id: str = None) -> list:
+    """
+    Tải đoạn video của một cụm rồi seek từng mốc trên file đã tải.
+    Nếu tải lỗi, cụm được trích xuất trực tiếp từ stream như bình thường.
+    """
+    if not fetch_section(stream_url, cluster, section_path):
+        return _extract_cluster(stream_url, cluster, out_prefix, image_format,
+                                False, hwaccel, video_id=video_id)
+    
+    start = parse_timestamp(cluster[0])
+    extracted = []
+    for ts in cluster:
+        result = extract_frame(section_path, ts, out_prefix, image_format,
+                               hwaccel=hwaccel, offset=start, video_id=video_id)
+        if result:
+            extracted.append(result)
+    return extracted
+
+
+def extract_frames(stream_url: str, timestamps: list, out_prefix: str,
+                   image_format: str = 'jpg', snap_keyframe: bool = False,
+                   workers: int = 4, hwaccel: str = 'none',
+                   download_sections: bool = False, video_id: str = None) -> list:
+    """
+    Trích xuất frame tại tất cả các mốc thời gian.
+    
+    Các mốc gần nhau được gom cụm (cluster_timestamps) để dùng chung một lần
+    giải mã; mốc đứng riêng được lấy bằng một lần seek. Các cụm được xử lý
+    song song với tối đa `workers` tiến trình ffmpeg.
+    
+    Với download_sections, mỗi cụm nhiều mốc là một job: tải đoạn video của
+    cụm về máy (fetch_section) rồi seek từng mốc trên file đã tải. Việc tải
+    các đoạn vì vậy cũng chạy song song như các cụm khác.
+    
+    Args:
+        stream_url: Direct stream URL của video
+        timestamps: Danh sách mốc thời gian (định dạng MM:SS hoặc HH:MM:SS)
+        out_prefix: Đường dẫn tuyệt đối của thư mục đầu ra
+        image_format: Định dạng ảnh (jpg, png hoặc webp)
+        snap_keyframe: Lấy keyframe gần nhất thay vì frame chính xác
+        workers: Số tiến trình ffmpeg chạy song song
+        hwaccel: Kiểu giải mã phần cứng (none, auto, cuda, vaapi, videotoolbox)
+        download_sections: Tải trước các đoạn video chứa cụm mốc thời gian
+        video_id: Video ID dùng để đặt tên file (xem output_filename)
+    
+    Returns:
+        Danh sách đường dẫn các file ảnh đã tạo, theo thứ tự thời gian
+    """
+    if snap_keyframe:
+        # Mỗi mốc chỉ giải mã một keyframe nên không cần gom cụm
+        clusters = [[ts] for ts in sorted(timestamps, key=parse_timestamp)]
+    else:
+        clusters = cluster_timestamps(timestamps)
+    
+    tmp_dir = None
+    if download_sections and any(len(cluster) > 1 for cluster in clusters):
+        tmp_dir = tempfile.mkdtemp(prefix='ytb-sections-')
+    
+    results = [[] for _ in clusters]
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(clusters)))) as executor:
+            futures = {}
+            for index, cluster in enumerate(clusters):
+                if tmp_dir and len(cluster) > 1:
+                    section_path = os.path.join(tmp_dir, f"section_{index:03d}.mp4")
+                    future = executor.submit(_extract_section, stream_url, cluster, section_path,
+                                             out_prefix, image_format, hwaccel, video_id)
+                else:
+                    future = executor.submit(_extract_cluster, stream_url, cluster, out_prefix,
+                                             image_format, snap_keyframe, hwaccel,
+                                             video_id=video_id)
+                futures[future] = index
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    return [path for job_files in results for path in job_files]
 
 
 def validate_youtube_url(url: str) -> bool:
     """Kiểm tra URL có phải là YouTube không."""
-    youtube_patterns = [
-        r'(https?://)?(www\.)?youtube\.com/watch\?v=[\w-]+',
-        r'(https?://)?(www\.)?youtu\.be/[\w-]+',
-        r'(https?://)?(www\.)?youtube\.com/shorts/[\w-]+'
-    ]
-    return any(re.match(pattern, url) for pattern in youtube_patterns)
+    return _YOUTUBE_URL_RE.match(url) is not None
 
 
 def create_cookie_file(cookie_content: str) -> str:
@@ -190,29 +803,70 @@ def create_cookie_file(cookie_content: str) -> str:
         with open(cookie_file, 'w') as f:
             f.write(cookie_content)
         
-        print(f"✅ Đã tạo file cookies: {cookie_file}")
+        log.info(f"✅ Đã tạo file cookies: {cookie_file}")
         return cookie_file
         
     except Exception as e:
-        print(f"❌ Lỗi khi tạo file cookies: {e}")
+        log.error(f"❌ Lỗi khi tạo file cookies: {e}")
         return None
 
 
 def main():
     """Hàm chính của chương trình."""
-    print("=" * 60)
-    print("       YOUTUBE FRAME EXTRACTOR")
-    print("       Trích xuất khung hình từ video YouTube")
-    print("=" * 60)
-    print()
+    parser = argparse.ArgumentParser(description="Trích xuất khung hình từ video YouTube.")
+    parser.add_argument('--url', help="Link video YouTube (bỏ qua bước nhập link)")
+    parser.add_argument('--timestamps',
+                        help="Các mốc thời gian, cách nhau bằng dấu phẩy (bỏ qua bước nhập)")
+    parser.add_argument('--output-dir', default='output',
+                        help="Thư mục lưu ảnh (mặc định: output)")
+    parser.add_argument('--cookies', help="File cookies định dạng Netscape (bỏ qua bước nhập cookies)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Số tiến trình ffmpeg chạy song song (mặc định: 4)")
+    parser.add_argument('--max-height', type=int, default=None,
+                        help="Giới hạn chiều cao video tải về, ví dụ 720 (mặc định: không giới hạn)")
+    parser.add_argument('--format', dest='image_format', choices=sorted(OUTPUT_FORMAT_OPTS),
+                        default='jpg', help="Định dạng ảnh đầu ra (mặc định: jpg)")
+    parser.add_argument('--snap-keyframe', action='store_true',
+                        help="Lấy keyframe gần nhất (nhanh hơn, có thể lệch vài giây)")
+    parser.add_argument('--hwaccel', choices=HWACCEL_CHOICES, default='none',
+                        help="Giải mã video bằng GPU (mặc định: none)")
+    parser.add_argument('--download-sections', action='store_true',
+                        help="Tải trước đoạn video chứa các mốc gần nhau rồi trích xuất trên máy")
+    parser.add_argument('--force', action='store_true',
+                        help="Trích xuất lại cả những frame đã có ảnh từ lần chạy trước")
+    parser.add_argument('--refresh-url', action='store_true',
+                        help="Bỏ qua stream URL đã lưu trong cache và lấy lại từ YouTube")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('-v', '--verbose', action='store_true',
+                           help="In chi tiết từng bước trích xuất")
+    verbosity.add_argument('-q', '--quiet', action='store_true',
+                           help="Chỉ in cảnh báo và lỗi (các câu hỏi khi chạy tương tác vẫn hiện)")
+    args = parser.parse_args()
+    
+    if args.quiet:
+        level = logging.WARNING
+    elif args.verbose:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+    logging.basicConfig(level=level, format='%(message)s', stream=sys.stdout)
+    
+    log.info("=" * 60)
+    log.info("       YOUTUBE FRAME EXTRACTOR")
+    log.info("       Trích xuất khung hình từ video YouTube")
+    log.info("=" * 60)
+    log.info("")
     
     # Kiểm tra dependencies
     check_dependencies()
-    print()
+    log.info("")
     
-    # Hỏi có muốn dùng cookies không
-    use_cookies = input("🍪 Bạn có muốn sử dụng cookies? (y/n): ").strip().lower()
-    cookies_file = None
+    # Hỏi có muốn dùng cookies không (chỉ khi chạy tương tác)
+    cookies_file = args.cookies
+    if cookies_file or args.url:
+        use_cookies = 'n'
+    else:
+        use_cookies = input("🍪 Bạn có muốn sử dụng cookies? (y/n): ").strip().lower()
     
     if use_cookies == 'y':
         print()
@@ -237,77 +891,126 @@ def main():
         print()
     
     # Nhập link YouTube
-    while True:
-        youtube_url = input("🔗 Nhập link YouTube: ").strip()
-        if validate_youtube_url(youtube_url):
-            break
-        print("❌ URL không hợp lệ. Vui lòng nhập link YouTube.")
-    
-    print()
+    if args.url:
+        youtube_url = args.url.strip()
+        if not validate_youtube_url(youtube_url):
+            log.error(f"❌ URL không hợp lệ: {youtube_url}")
+            sys.exit(1)
+    else:
+        while True:
+            youtube_url = input("🔗 Nhập link YouTube: ").strip()
+            if validate_youtube_url(youtube_url):
+                break
+            print("❌ URL không hợp lệ. Vui lòng nhập link YouTube.")
+        
+        print()
     
     # Nhập danh sách mốc thời gian
-    print("⏱️  Nhập các mốc thời gian (định dạng MM:SS hoặc HH:MM:SS)")
-    print("   Có thể nhập nhiều mốc, cách nhau bằng dấu phẩy")
-    print("   Ví dụ: 02:30, 05:10, 10:00")
-    print()
-    
-    while True:
-        timestamps_input = input("   Các mốc thời gian: ").strip()
-        if timestamps_input:
-            break
-        print("   ❌ Vui lòng nhập ít nhất một mốc thời gian.")
+    if args.timestamps:
+        timestamps_input = args.timestamps.strip()
+    else:
+        print("⏱️  Nhập các mốc thời gian (định dạng MM:SS hoặc HH:MM:SS)")
+        print("   Có thể nhập nhiều mốc, cách nhau bằng dấu phẩy")
+        print("   Ví dụ: 02:30, 05:10, 10:00")
+        print()
+        
+        while True:
+            timestamps_input = input("   Các mốc thời gian: ").strip()
+            if timestamps_input:
+                break
+            print("   ❌ Vui lòng nhập ít nhất một mốc thời gian.")
     
     # Parse timestamps
     timestamps = [ts.strip() for ts in timestamps_input.split(',')]
     
-    # Validate timestamps
+    # Validate timestamps, bỏ các mốc trùng tên file đầu ra (ví dụ "1:00" và
+    # "01:00") để hai job không cùng ghi một file
+    video_id = extract_video_id(youtube_url)
     valid_timestamps = []
+    seen_filenames = set()
     for ts in timestamps:
-        try:
-            parse_timestamp(ts)  # Kiểm tra định dạng
+        if not _TS_RE.match(ts):
+            log.warning(f"   ⚠️  Bỏ qua timestamp không hợp lệ: {ts}")
+            continue
+        filename = output_filename(ts, args.image_format, video_id, args.snap_keyframe)
+        if filename not in seen_filenames:
+            seen_filenames.add(filename)
             valid_timestamps.append(ts)
-        except ValueError as e:
-            print(f"   ⚠️  Bỏ qua timestamp không hợp lệ: {ts}")
     
     if not valid_timestamps:
-        print("❌ Không có timestamp hợp lệ nào. Thoát chương trình.")
+        log.error("❌ Không có timestamp hợp lệ nào. Thoát chương trình.")
         sys.exit(1)
     
-    print()
-    print(f"📋 Sẽ trích xuất {len(valid_timestamps)} frame: {', '.join(valid_timestamps)}")
-    print()
-    
-    # Tạo thư mục output
-    output_dir = Path("output")
-    output_dir.mkdir(exist_ok=True)
-    
-    # Lấy stream URL (với cookies nếu có)
-    stream_url = get_video_stream_url(youtube_url, cookies_file)
-    print()
+    log.info("")
+    log.info(f"📋 Sẽ trích xuất {len(valid_timestamps)} frame: {', '.join(valid_timestamps)}")
+    log.info("")
     
-    # Trích xuất các frame
-    print("🎬 Bắt đầu trích xuất frames...")
-    print("-" * 40)
+    # --snap-keyframe không gom cụm nên không có đoạn video nào để tải trước
+    if args.download_sections and args.snap_keyframe:
+        log.warning("⚠️  --download-sections không có tác dụng khi dùng --snap-keyframe, bỏ qua.")
+        args.download_sections = False
     
-    extracted_files = []
-    for ts in valid_timestamps:
-        result = extract_frame(stream_url, ts, output_dir)
-        if result:
-            extracted_files.append(result)
+    # Tạo thư mục output
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    out_prefix = str(output_dir.resolve())
+    
+    # Bỏ qua các frame đã có ảnh từ lần chạy trước
+    cached_files = {}
+    if not args.force:
+        cached_files = find_cached_outputs(valid_timestamps, out_prefix, args.image_format,
+                                           video_id, args.snap_keyframe)
+        if cached_files:
+            log.info(f"♻️  Dùng lại {len(cached_files)} frame đã có (dùng --force để trích xuất lại)")
+            log.info("")
+    pending_timestamps = [ts for ts in valid_timestamps if ts not in cached_files]
+    
+    new_files = []
+    if pending_timestamps:
+        # Lấy stream URL (với cookies nếu có)
+        stream_url, from_cache = get_video_stream_url_cached(youtube_url, cookies_file,
+                                                             args.max_height, args.refresh_url)
+        log.info("")
+        
+        # Trích xuất các frame
+        log.info("🎬 Bắt đầu trích xuất frames...")
+        log.info("-" * 40)
+        
+        new_files = extract_frames(stream_url, pending_timestamps, out_prefix,
+                                   args.image_format, args.snap_keyframe, args.workers,
+                                   args.hwaccel, args.download_sections, video_id)
+        
+        # URL trong cache có thể đã bị YouTube từ chối dù chưa hết hạn: lấy
+        # lại URL mới (xóa cache) và thử lại một lần các mốc bị lỗi
+        if from_cache and len(new_files) < len(pending_timestamps):
+            saved = {Path(f).name for f in new_files}
+            failed_timestamps = [
+                ts for ts in pending_timestamps
+                if output_filename(ts, args.image_format, video_id, args.snap_keyframe) not in saved
+            ]
+            log.warning(f"⚠️  {len(failed_timestamps)} frame lỗi với stream URL trong cache, "
+                        "lấy lại URL và thử lại...")
+            stream_url, _ = get_video_stream_url_cached(youtube_url, cookies_file,
+                                                        args.max_height, refresh=True)
+            new_files += extract_frames(stream_url, failed_timestamps, out_prefix,
+                                        args.image_format, args.snap_keyframe, args.workers,
+                                        args.hwaccel, args.download_sections, video_id)
+        
+        log.info("-" * 40)
+        log.info("")
     
-    print("-" * 40)
-    print()
+    extracted_files = list(cached_files.values()) + new_files
     
     # Tổng kết
-    print("=" * 60)
-    print(f"✨ HOÀN THÀNH!")
-    print(f"   Đã trích xuất: {len(extracted_files)}/{len(valid_timestamps)} frames")
-    print(f"   Thư mục đầu ra: {output_dir.absolute()}")
-    print()
-    print("📁 Các file đã tạo:")
+    log.info("=" * 60)
+    log.info(f"✨ HOÀN THÀNH!")
+    log.info(f"   Đã trích xuất: {len(extracted_files)}/{len(valid_timestamps)} frames")
+    log.info(f"   Thư mục đầu ra: {out_prefix}")
+    log.info("")
+    log.info("📁 Các file đã tạo:")
     for f in extracted_files:
-        print(f"   - {Path(f).name}")
-    print("=" * 60)
+        log.info(f"   - {Path(f).name}")
+    log.info("=" * 60)
 
 
 if __name__ == "__main__":